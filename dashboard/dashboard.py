@@ -5,9 +5,18 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import numpy as np
 from datetime import datetime
+import os
+import sys
 import warnings
 warnings.filterwarnings('ignore')
 
+# Streamlit re-executes this script on every interaction, so only add the path once
+ANALYSIS_PATH = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'processing'))
+if ANALYSIS_PATH not in sys.path:
+    sys.path.append(ANALYSIS_PATH)
+from analysis import segment_customers
+from data_refresh import start_refresher
+
 st.set_page_config(
     page_title="Olist E-commerce Dashboard",
     page_icon="🛒",
@@ -15,40 +24,12 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-@st.cache_data
-def load_data():
-    """
-    Load processed data from CSV files with caching for performance.
-    This function runs only once when the app starts or when data changes.
-    """
-    try:
-        customers = pd.read_csv('data/processed/customers_processed.csv')
-        orders = pd.read_csv('data/processed/orders_processed.csv')
-        
-        date_columns = ['order_purchase_dt', 'order_approved_dt', 
-                       'order_delivered_carrier_dt', 'order_delivered_customer_dt', 
-                       'order_estimated_delivery_dt']
-        
-        
-        for col in date_columns:
-            if col in orders.columns:
-                orders[col] = pd.to_datetime(orders[col], errors='coerce')
-        
-        orders['order_month'] = orders['order_purchase_dt'].dt.to_period('M').astype(str)
-        
-        return customers, orders
-    except Exception as e:
-        st.error(f"Error loading data: {e}")
-        return None, None
-
-@st.cache_data
-def get_filter_options(customers, orders):
+@st.cache_resource
+def get_data_refresher():
     """
-    Extract unique values for filter dropdowns
+    One refresher per server process, shared by all sessions
     """
-    states = ['All States'] + sorted(customers['customer_state'].unique().tolist())
-    months = ['All Months'] + sorted(orders['order_month'].dropna().unique().tolist())
-    return states, months
+    return start_refresher()
 
 def filter_data(customers, orders, selected_state, selected_month):
     """
@@ -208,17 +189,7 @@ def create_customer_segments_chart(customers, orders):
     
     customer_order_counts = orders['customer_id'].value_counts()
     
-    segments = []
-    for count in customer_order_counts.values:
-        if count == 1:
-            segments.append('One-time Customer')
-        elif count <= 3:
-            segments.append('Repeat Customer (2-3 orders)')
-        else:
-            segments.append('Loyal Customer (4+ orders)')
-    
-    segment_df = pd.DataFrame({'segment': segments})
-    segment_counts = segment_df['segment'].value_counts()
+    segment_counts = segment_customers(customer_order_counts).astype(str).value_counts()
     
     fig = px.bar(
         x=segment_counts.index,
@@ -258,15 +229,21 @@ def main():
     st.markdown("---")
     
 
-    customers, orders = load_data()
-    
-    if customers is None or orders is None:
-        st.error("Failed to load data. Please check your data files.")
+    try:
+        refresher = get_data_refresher()
+    except Exception as e:
+        st.error(f"Failed to load data: {e}. Please check your data files.")
         return
+    
+    # Read the snapshot once so this run works on one dataset even if a swap happens mid-run.
+    # Sessions do not keep it between runs, so only the latest snapshot outlives a run.
+    snapshot = refresher.current
+    
+    customers, orders = snapshot.customers, snapshot.orders
   
     st.sidebar.header("Filters")
     
-    states, months = get_filter_options(customers, orders)
+    states, months = snapshot.states, snapshot.months
     
     selected_state = st.sidebar.selectbox("Select State:", states)
     selected_month = st.sidebar.selectbox("Select Month:", months)
@@ -338,6 +315,7 @@ def main():
         st.write(f"• Total orders: {len(orders):,}")
         st.write(f"• Date range: {orders['order_purchase_dt'].min().strftime('%Y-%m-%d')} to {orders['order_purchase_dt'].max().strftime('%Y-%m-%d')}")
         st.write(f"• States covered: {customers['customer_state'].nunique()}")
+        st.write(f"• Data loaded at: {snapshot.loaded_at.strftime('%Y-%m-%d %H:%M:%S')}")
     
     with col2:
         if not filtered_orders.empty:
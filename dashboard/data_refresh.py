@@ -0,0 +1,174 @@
+import json
+import os
+import threading
+from collections import namedtuple
+from datetime import datetime
+
+import pandas as pd
+from dotenv import load_dotenv
+
+from processed_store import PROCESSED_FILES, S3_MANIFEST_KEY, file_fingerprint, read_local_manifest
+
+load_dotenv()
+DATA_SOURCE = os.getenv("DASHBOARD_DATA_SOURCE", "local")
+S3_BUCKET = os.getenv("S3_BUCKET")
+REFRESH_INTERVAL_SECONDS = int(os.getenv("DASHBOARD_REFRESH_SECONDS", "60"))
+
+Snapshot = namedtuple("Snapshot", ["version", "customers", "orders", "states", "months", "loaded_at"])
+
+class StaleDataError(Exception):
+    """
+    Raised when a processed file no longer matches the manifest it is being read for
+    """
+
+def get_s3_client():
+    import boto3
+    return boto3.client("s3", region_name=os.getenv("AWS_REGION"))
+
+def get_data_version(s3_client=None):
+    """
+    Version of the last complete write, taken from the manifest written after the data files.
+
+    One marker per processed file: its ETag on S3, its (mtime, size) locally.
+    """
+    if DATA_SOURCE == "s3":
+        response = s3_client.get_object(Bucket=S3_BUCKET, Key=S3_MANIFEST_KEY)
+        manifest = json.loads(response["Body"].read())
+        return tuple(manifest[name]["etag"] for name in PROCESSED_FILES)
+    manifest = read_local_manifest()
+    return tuple(tuple(manifest[name]["fingerprint"]) for name in PROCESSED_FILES)
+
+def read_processed_csv(name, marker, s3_client=None):
+    """
+    Read one processed file, failing if it is not the exact file the manifest describes
+    """
+    local_path, s3_key = PROCESSED_FILES[name]
+    if DATA_SOURCE == "s3":
+        from botocore.exceptions import ClientError
+        try:
+            response = s3_client.get_object(Bucket=S3_BUCKET, Key=s3_key, IfMatch=marker)
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("PreconditionFailed", "412"):
+                raise StaleDataError(f"{s3_key} does not match the manifest") from e
+            raise
+        return pd.read_csv(response["Body"])
+
+    # Files are renamed into place, so a changed fingerprint means a newer write started
+    if tuple(file_fingerprint(local_path)) != marker:
+        raise StaleDataError(f"{local_path} does not match the manifest")
+    df = pd.read_csv(local_path)
+    if tuple(file_fingerprint(local_path)) != marker:
+        raise StaleDataError(f"{local_path} changed while loading")
+    return df
+
+def load_data(version, s3_client=None):
+    """
+    Load processed data and derive the columns the dashboard filters on
+    """
+    markers = dict(zip(PROCESSED_FILES, version))
+    customers = read_processed_csv("customers", markers["customers"], s3_client)
+    orders = read_processed_csv("orders", markers["orders"], s3_client)
+
+    date_columns = ['order_purchase_dt', 'order_approved_dt',
+                   'order_delivered_carrier_dt', 'order_delivered_customer_dt',
+                   'order_estimated_delivery_dt']
+
+    for col in date_columns:
+        if col in orders.columns:
+            orders[col] = pd.to_datetime(orders[col], errors='coerce')
+
+    orders['order_month'] = orders['order_purchase_dt'].dt.to_period('M').astype(str)
+
+    return customers, orders
+
+def get_filter_options(customers, orders):
+    """
+    Extract unique values for filter dropdowns
+    """
+    states = ['All States'] + sorted(customers['customer_state'].unique().tolist())
+    months = ['All Months'] + sorted(orders['order_month'].dropna().unique().tolist())
+    return states, months
+
+def load_snapshot(s3_client=None, attempts=3):
+    """
+    Load a complete, ready-to-serve dataset tagged with the manifest version it was read from.
+
+    Every file is pinned to its marker in the manifest, so a write that is only half
+    done (new customers, old orders, old manifest) is rejected and retried.
+    """
+    for _ in range(attempts):
+        version = get_data_version(s3_client)
+        try:
+            customers, orders = load_data(version, s3_client)
+        except StaleDataError:
+            continue
+        states, months = get_filter_options(customers, orders)
+        return Snapshot(version, customers, orders, states, months, datetime.now())
+    raise StaleDataError(f"Processed data did not match its manifest in {attempts} load attempts")
+
+class DataRefresher:
+    """
+    Keeps the active snapshot fresh from a background thread.
+
+    Only the latest snapshot is held here; each script run reads `current` once,
+    so an older snapshot lives only until the runs that started on it finish.
+    """
+
+    def __init__(self, interval=REFRESH_INTERVAL_SECONDS, initial=None):
+        self.interval = interval
+        self.s3_client = get_s3_client() if DATA_SOURCE == "s3" else None
+        self.current = initial if initial is not None else load_snapshot(self.s3_client)
+        self.attempts = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="data-refresher", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        # Only signal: a load in progress finishes on its own thread, nobody waits for it
+        self._stop.set()
+
+    def refresh(self):
+        """
+        Load the store if its version changed; returns True when a new snapshot was swapped in
+        """
+        if get_data_version(self.s3_client) == self.current.version:
+            return False
+        snapshot = load_snapshot(self.s3_client)
+        # A single attribute assignment is atomic, so readers see either the old or the new snapshot
+        self.current = snapshot
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.attempts += 1
+            try:
+                if self.refresh():
+                    print(f"Loaded new data snapshot at {self.current.loaded_at:%Y-%m-%d %H:%M:%S}")
+            except Exception as e:
+                # Keep serving the last good snapshot and retry on the next tick
+                print(f"Error refreshing data: {e}")
+
+# This module is imported once per process, unlike the Streamlit script that reruns,
+# so it is where the one active refresher is tracked.
+_active_refresher = None
+_registry_lock = threading.Lock()
+
+def start_refresher(interval=REFRESH_INTERVAL_SECONDS):
+    """
+    Start the process-wide refresher, replacing any previous one.
+
+    A replaced refresher is stopped and hands over its snapshot, so rebuilding
+    the refresher never means a cold reload.
+    """
+    global _active_refresher
+    with _registry_lock:
+        previous = _active_refresher
+        initial = None
+        if previous is not None:
+            previous.stop()
+            initial = previous.current
+        _active_refresher = DataRefresher(interval, initial=initial).start()
+        return _active_refresher
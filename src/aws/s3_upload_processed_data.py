@@ -1,4 +1,5 @@
 import boto3
+import json
 import os
 from dotenv import load_dotenv
 
@@ -22,13 +23,30 @@ processed_files = {
     "data/processed/orders_processed.csv": "processed/orders/orders_processed.csv",
 }
 
+# Read by the dashboard to know which uploads belong together
+MANIFEST_KEY = "processed/manifest.json"
+manifest_names = {
+    "processed/customers/customers_processed.csv": "customers",
+    "processed/orders/orders_processed.csv": "orders",
+}
+manifest = {}
+
 # Upload each file
 for local_path, s3_key in processed_files.items():
     if os.path.exists(local_path):
         try:
             s3_client.upload_file(local_path, S3_BUCKET, s3_key)
+            etag = s3_client.head_object(Bucket=S3_BUCKET, Key=s3_key)["ETag"]
+            manifest[manifest_names[s3_key]] = {"key": s3_key, "etag": etag}
             print(f"✅ Uploaded {local_path} → s3://{S3_BUCKET}/{s3_key}")
         except Exception as e:
             print(f"❌ Failed to upload {local_path}: {e}")
     else:
         print(f"⚠️ File not found: {local_path}")
+
+# The manifest goes last and only once every file is up, so it always describes one complete upload
+if len(manifest) == len(processed_files):
+    s3_client.put_object(Bucket=S3_BUCKET, Key=MANIFEST_KEY, Body=json.dumps(manifest, indent=2))
+    print(f"✅ Uploaded manifest → s3://{S3_BUCKET}/{MANIFEST_KEY}")
+else:
+    print("⚠️ Manifest not updated; the dashboard keeps serving the previous upload")
@@ -0,0 +1,129 @@
+import numpy as np
+import pandas as pd
+
+SHOPPING_SEASONS = {
+    11: "Black Friday",
+    12: "Christmas Season",
+    1: "New Year",
+    5: "Mothers Day",
+    8: "Fathers Day",
+    6: "Valentine Day Brazil",
+    2: "Back to School",
+    7: "Mid Year Sales",
+    3: "Easter Season",
+    4: "Easter Season",
+}
+
+STAGE_HOUR_COLUMNS = {
+    "purchase_to_approval_hours": ("order_purchase_dt", "order_approved_dt"),
+    "approval_to_carrier_hours": ("order_approved_dt", "order_delivered_carrier_dt"),
+    "carrier_to_customer_hours": ("order_delivered_carrier_dt", "order_delivered_customer_dt"),
+    "total_delivery_hours": ("order_purchase_dt", "order_delivered_customer_dt"),
+    "delivery_vs_estimate_hours": ("order_estimated_delivery_dt", "order_delivered_customer_dt"),
+}
+
+
+def identify_shopping_season(months: pd.Series) -> pd.Series:
+    # Months outside the event calendar (and missing dates) are regular trading months
+    return months.map(SHOPPING_SEASONS).fillna("Regular")
+
+
+def assign_period(purchase_dt: pd.Series) -> pd.Series:
+    # Split orders at the median purchase date, computed once for the whole column
+    midpoint = purchase_dt.quantile(0.5)
+    return pd.Series(
+        np.where(purchase_dt < midpoint, "Early", "Late"),
+        index=purchase_dt.index
+    )
+
+
+def regional_performance(business_df: pd.DataFrame) -> pd.DataFrame:
+    performance = business_df.groupby("customer_state").agg({
+        "customer_id": "count",
+        "customer_unique_id": "nunique",
+        "customer_city": "nunique"
+    }).reset_index()
+
+    performance.columns = ["state", "total_orders", "unique_customers", "cities_served"]
+    performance["orders_per_customer"] = (
+        performance["total_orders"] / performance["unique_customers"]
+    ).round(2)
+    performance["market_share"] = (
+        performance["total_orders"] / performance["total_orders"].sum() * 100
+    ).round(2)
+    performance["market_maturity"] = classify_market_maturity(performance)
+
+    return performance.sort_values("total_orders", ascending=False)
+
+
+def classify_market_maturity(performance: pd.DataFrame) -> pd.Series:
+    orders = performance["total_orders"]
+    conditions = [
+        (orders >= 5000)
+        & (performance["cities_served"] >= 50)
+        & (performance["orders_per_customer"] >= 1.2),
+        orders >= 1000,
+        orders >= 100,
+    ]
+    choices = ["Established", "Growing", "Emerging"]
+    return pd.Series(np.select(conditions, choices, default="Nascent"), index=performance.index)
+
+
+def classify_growth(growth_rate: pd.Series) -> pd.Series:
+    conditions = [growth_rate > 50, growth_rate > 0, growth_rate > -25]
+    choices = ["High Growth", "Growing", "Declining"]
+    return pd.Series(np.select(conditions, choices, default="⚠️Sharp Decline"), index=growth_rate.index)
+
+
+def regional_growth(business_df: pd.DataFrame, period: pd.Series = None, min_orders: int = 100) -> pd.DataFrame:
+    # Reuse an already assigned period so the median is not computed twice
+    if period is None:
+        period = assign_period(business_df["order_purchase_dt"])
+
+    growth = pd.crosstab(business_df["customer_state"], period).reindex(
+        columns=["Early", "Late"], fill_value=0
+    ).astype(float)
+    growth.columns.name = "period"
+
+    growth["growth_rate"] = ((growth["Late"] - growth["Early"]) / growth["Early"] * 100).round(2)
+    growth["total_orders"] = growth["Early"] + growth["Late"]
+    growth = growth[growth["total_orders"] >= min_orders].copy()
+    growth["classification"] = classify_growth(growth["growth_rate"])
+
+    return growth.sort_values("growth_rate", ascending=False)
+
+
+def calculate_stage_times(df: pd.DataFrame) -> pd.DataFrame:
+    """Calculate time differences (in hours) between order stages"""
+    for column, (start, end) in STAGE_HOUR_COLUMNS.items():
+        df[column] = (df[end] - df[start]).dt.total_seconds() / 3600
+    return df
+
+
+def replace_negative_with_median(df: pd.DataFrame, columns, fill_missing: bool = False) -> pd.DataFrame:
+    # Negative durations are data-entry errors; fill them with the median of the valid values.
+    # With fill_missing, missing durations are filled the same way.
+    for column in columns:
+        values = df[column]
+        valid = values >= 0
+        if fill_missing and not valid.any():
+            continue
+        invalid = ~valid if fill_missing else values < 0
+        df[column] = values.mask(invalid, values[valid].median())
+    return df
+
+
+def split_approval_speed(approval_hours: pd.Series) -> pd.Series:
+    median_approval = approval_hours.median()
+    return pd.Series(
+        np.where(approval_hours <= median_approval, "Fast", "Slow"),
+        index=approval_hours.index
+    )
+
+
+def segment_customers(order_counts: pd.Series) -> pd.Series:
+    return pd.cut(
+        order_counts,
+        bins=[0, 1, 3, np.inf],
+        labels=["One-time Customer", "Repeat Customer (2-3 orders)", "Loyal Customer (4+ orders)"]
+    )
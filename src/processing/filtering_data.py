@@ -2,6 +2,7 @@ import os
 import pandas as pd
 import frameon as fron
 from cleaning_data import clean_orders, clean_customers
+from processed_store import write_processed_csvs
 
 def prepare_customers_orders():
     customers_df = clean_customers()
@@ -39,8 +40,8 @@ def prepare_customers_orders():
     customersdf_after = fron.analyze_join_keys(customers_df, orders_df, on="customer_id", only_coverage=True)
     print(f"after: {customersdf_after}")
 
-    customers_df.to_csv("data/processed/customers_processed.csv", index=False)
-    orders_df.to_csv("data/processed/orders_processed.csv", index=False)
+    # Written through temp files with a manifest last, so the dashboard never picks up half a write
+    write_processed_csvs({"customers": customers_df, "orders": orders_df})
     print("Processed data saved in data/processed/")
     return customers_df, orders_df
 
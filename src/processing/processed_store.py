@@ -0,0 +1,55 @@
+import json
+import os
+
+# Local path and S3 key of each processed file (same layout as src/aws/s3_upload_processed_data.py)
+PROCESSED_FILES = {
+    "customers": ("data/processed/customers_processed.csv", "processed/customers/customers_processed.csv"),
+    "orders": ("data/processed/orders_processed.csv", "processed/orders/orders_processed.csv"),
+}
+
+# Written after every data file, so it always describes one complete write
+LOCAL_MANIFEST = "data/processed/manifest.json"
+S3_MANIFEST_KEY = "processed/manifest.json"
+
+
+def file_fingerprint(path: str) -> list:
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def write_json_atomic(path: str, data: dict):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def write_local_manifest() -> dict:
+    manifest = {
+        name: {"path": local_path, "fingerprint": file_fingerprint(local_path)}
+        for name, (local_path, _) in PROCESSED_FILES.items()
+    }
+    write_json_atomic(LOCAL_MANIFEST, manifest)
+    return manifest
+
+
+def write_processed_csvs(frames: dict) -> dict:
+    # Each file is renamed into place, then the manifest is written last.
+    # Readers only trust files whose fingerprint matches the manifest.
+    for name, df in frames.items():
+        local_path, _ = PROCESSED_FILES[name]
+        tmp_path = f"{local_path}.tmp"
+        df.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, local_path)
+    return write_local_manifest()
+
+
+def read_local_manifest() -> dict:
+    with open(LOCAL_MANIFEST) as f:
+        return json.load(f)
+
+
+if __name__ == "__main__":
+    # Stamp processed files that were written before the manifest existed
+    write_local_manifest()
+    print(f"Manifest written to {LOCAL_MANIFEST}")
@@ -0,0 +1,8 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# src/processing and dashboard use flat imports, so expose them the same way the notebooks do
+sys.path.append(os.path.join(ROOT, "src", "processing"))
+sys.path.append(os.path.join(ROOT, "dashboard"))
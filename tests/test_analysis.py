@@ -0,0 +1,251 @@
+import numpy as np
+import pandas as pd
+import pandas.testing as tm
+
+import analysis
+
+
+# Row-wise versions as they were written in the notebooks, kept as the reference behaviour
+
+def old_identify_shopping_season(row):
+    month = row['order_month']
+
+    if month == 11:
+        return 'Black Friday'
+    elif month == 12:
+        return 'Christmas Season'
+    elif month == 1:
+        return 'New Year'
+    elif month == 5:
+        return 'Mothers Day'
+    elif month == 8:
+        return 'Fathers Day'
+    elif month == 6:
+        return 'Valentine Day Brazil'
+    elif month == 2:
+        return 'Back to School'
+    elif month == 7:
+        return 'Mid Year Sales'
+    elif month in [3, 4]:
+        return 'Easter Season'
+    else:
+        return 'Regular'
+
+
+def old_classify_market_maturity(row):
+    orders = row['total_orders']
+    cities = row['cities_served']
+    orders_per_customer = row['orders_per_customer']
+
+    if orders >= 5000 and cities >= 50 and orders_per_customer >= 1.2:
+        return 'Established'
+    elif orders >= 1000 and orders >= 500:
+        return 'Growing'
+    elif orders >= 100:
+        return 'Emerging'
+    else:
+        return 'Nascent'
+
+
+def old_classify_growth(growth_rate):
+    if growth_rate > 50:
+        return "High Growth"
+    elif growth_rate > 0:
+        return "Growing"
+    elif growth_rate > -25:
+        return "Declining"
+    else:
+        return "⚠️Sharp Decline"
+
+
+def old_segment(count):
+    if count == 1:
+        return 'One-time Customer'
+    elif count <= 3:
+        return 'Repeat Customer (2-3 orders)'
+    else:
+        return 'Loyal Customer (4+ orders)'
+
+
+def old_regional_growth(business_df):
+    business_df = business_df.copy()
+    business_df['period'] = business_df['order_purchase_dt'].apply(
+        lambda x: 'Early' if x < business_df['order_purchase_dt'].quantile(0.5) else 'Late'
+    )
+
+    growth_analysis = business_df.groupby(['customer_state', 'period']).agg({
+        'customer_id': 'count'
+    }).reset_index().pivot(index='customer_state', columns='period', values='customer_id').fillna(0)
+
+    growth_analysis['growth_rate'] = ((growth_analysis['Late'] - growth_analysis['Early']) /
+                                      growth_analysis['Early'] * 100).round(2)
+    growth_analysis['total_orders'] = growth_analysis['Early'] + growth_analysis['Late']
+    return growth_analysis
+
+
+def make_business_df():
+    # Orders are ordered in time: the first four fall before the median, the rest after it.
+    # State A grows, B has no Late orders, C has no Early orders (inf growth), D is flat.
+    return pd.DataFrame({
+        "customer_id": [f"c{i}" for i in range(9)],
+        "customer_state": ["A", "B", "B", "D", "A", "A", "C", "D", "A"],
+        "order_purchase_dt": pd.to_datetime([
+            "2017-01-01", "2017-02-01", "2017-03-01", "2017-04-01", "2017-05-01",
+            "2017-06-01", "2017-07-01", "2017-08-01", None,
+        ]),
+    })
+
+
+def test_assign_period_matches_row_wise_split():
+    purchase_dt = make_business_df()["order_purchase_dt"]
+    midpoint = purchase_dt.quantile(0.5)
+    expected = purchase_dt.apply(lambda x: 'Early' if x < midpoint else 'Late')
+
+    tm.assert_series_equal(analysis.assign_period(purchase_dt), expected, check_names=False)
+
+
+def test_assign_period_puts_missing_dates_in_late():
+    purchase_dt = make_business_df()["order_purchase_dt"]
+
+    assert analysis.assign_period(purchase_dt).iloc[-1] == "Late"
+
+
+def test_identify_shopping_season_covers_every_month():
+    months = pd.Series(list(range(1, 13)) + [np.nan], name="order_month")
+    expected = months.to_frame().apply(old_identify_shopping_season, axis=1)
+
+    result = analysis.identify_shopping_season(months)
+
+    assert result.tolist() == expected.tolist()
+    assert result.iloc[-1] == "Regular"
+
+
+def test_classify_market_maturity_boundaries():
+    performance = pd.DataFrame({
+        "total_orders":        [5000, 4999, 5000, 5000, 1000, 999, 100, 99],
+        "cities_served":       [50,   50,   49,   50,   200,  200, 1,   1],
+        "orders_per_customer": [1.2,  1.2,  1.2,  1.19, 2.0,  2.0, 1.0, 1.0],
+    })
+    expected = performance.apply(old_classify_market_maturity, axis=1)
+
+    result = analysis.classify_market_maturity(performance)
+
+    assert result.tolist() == expected.tolist()
+    assert result.tolist() == [
+        "Established", "Growing", "Growing", "Growing",
+        "Growing", "Emerging", "Emerging", "Nascent",
+    ]
+
+
+def test_classify_growth_boundaries():
+    growth_rate = pd.Series([np.inf, 50.01, 50, 0.01, 0, -24.99, -25, -100])
+    expected = growth_rate.apply(old_classify_growth)
+
+    result = analysis.classify_growth(growth_rate)
+
+    assert result.tolist() == expected.tolist()
+    assert result.iloc[-1] == "⚠️Sharp Decline"
+
+
+def test_segment_customers_matches_loop():
+    counts = pd.Series([1, 2, 3, 4])
+
+    result = analysis.segment_customers(counts).astype(str)
+
+    assert result.tolist() == [old_segment(count) for count in counts]
+
+
+def test_regional_growth_matches_pivot():
+    business_df = make_business_df()
+    expected = old_regional_growth(business_df)
+    expected = expected.sort_values('growth_rate', ascending=False)
+
+    result = analysis.regional_growth(business_df, min_orders=0)
+
+    tm.assert_frame_equal(result.drop(columns="classification"), expected, check_names=False)
+    assert result.loc["C", "growth_rate"] == np.inf
+    assert result.loc["C", "classification"] == "High Growth"
+    assert result.loc["B", "Late"] == 0
+    assert result.loc["B", "classification"] == "⚠️Sharp Decline"
+
+
+def test_regional_growth_reuses_given_period():
+    business_df = make_business_df()
+    period = pd.Series("Late", index=business_df.index)
+
+    result = analysis.regional_growth(business_df, period=period, min_orders=0)
+
+    assert (result["Early"] == 0).all()
+
+
+def test_regional_growth_filters_small_states():
+    result = analysis.regional_growth(make_business_df(), min_orders=3)
+
+    assert result.index.tolist() == ["A"]
+
+
+def test_replace_negative_with_median_matches_apply():
+    df = pd.DataFrame({"hours": [1.0, -2.0, np.nan, 5.0, 3.0]})
+    median_val = df.loc[df["hours"] >= 0, "hours"].median()
+    expected = df["hours"].apply(lambda x: median_val if x < 0 else x)
+
+    result = analysis.replace_negative_with_median(df.copy(), ["hours"])
+
+    tm.assert_series_equal(result["hours"], expected)
+    assert np.isnan(result["hours"].iloc[2])
+
+
+def test_replace_negative_with_median_fill_missing_matches_where():
+    df = pd.DataFrame({"hours": [1.0, -2.0, np.nan, 5.0, 3.0]})
+    positive_values = df["hours"][df["hours"] >= 0]
+    expected = df["hours"].where(df["hours"] >= 0, positive_values.median())
+
+    result = analysis.replace_negative_with_median(df.copy(), ["hours"], fill_missing=True)
+
+    tm.assert_series_equal(result["hours"], expected)
+    assert result["hours"].tolist() == [1.0, 3.0, 3.0, 5.0, 3.0]
+
+
+def test_replace_negative_with_median_without_valid_values_matches_apply():
+    df = pd.DataFrame({"hours": [-1.0, -5.0, np.nan]})
+    median_val = df.loc[df["hours"] >= 0, "hours"].median()
+    expected = df["hours"].apply(lambda x: median_val if x < 0 else x)
+
+    result = analysis.replace_negative_with_median(df.copy(), ["hours"])
+
+    tm.assert_series_equal(result["hours"], expected)
+    assert result["hours"].isna().all()
+
+
+def test_replace_negative_with_median_fill_missing_leaves_column_without_valid_values():
+    df = pd.DataFrame({"hours": [-1.0, -5.0, np.nan]})
+
+    result = analysis.replace_negative_with_median(df.copy(), ["hours"], fill_missing=True)
+
+    tm.assert_series_equal(result["hours"], df["hours"])
+
+
+def test_split_approval_speed_matches_row_wise():
+    hours = pd.Series([1.0, 10.0, 2.0, np.nan, 5.0])
+    median_approval = hours.median()
+    expected = hours.apply(lambda x: 'Fast' if x <= median_approval else 'Slow')
+
+    tm.assert_series_equal(analysis.split_approval_speed(hours), expected)
+
+
+def test_calculate_stage_times_in_hours():
+    df = pd.DataFrame({
+        "order_purchase_dt": pd.to_datetime(["2017-01-01 00:00"]),
+        "order_approved_dt": pd.to_datetime(["2017-01-01 06:00"]),
+        "order_delivered_carrier_dt": pd.to_datetime(["2017-01-02 00:00"]),
+        "order_delivered_customer_dt": pd.to_datetime(["2017-01-05 00:00"]),
+        "order_estimated_delivery_dt": pd.to_datetime(["2017-01-06 00:00"]),
+    })
+
+    result = analysis.calculate_stage_times(df).iloc[0]
+
+    assert result["purchase_to_approval_hours"] == 6
+    assert result["approval_to_carrier_hours"] == 18
+    assert result["carrier_to_customer_hours"] == 72
+    assert result["total_delivery_hours"] == 96
+    assert result["delivery_vs_estimate_hours"] == -24
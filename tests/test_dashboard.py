@@ -0,0 +1,296 @@
+import importlib
+import io
+import json
+import os
+import sys
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+import dashboard
+import data_refresh
+import processed_store
+
+CUSTOMERS_PATH, CUSTOMERS_KEY = processed_store.PROCESSED_FILES["customers"]
+ORDERS_PATH, ORDERS_KEY = processed_store.PROCESSED_FILES["orders"]
+
+
+def make_frames(orders_count=2):
+    customers = pd.DataFrame({
+        "customer_id": [f"c{i}" for i in range(orders_count)],
+        "customer_state": ["SP", "RJ"] * (orders_count // 2) + ["SP"] * (orders_count % 2),
+    })
+    orders = pd.DataFrame({
+        "customer_id": [f"c{i}" for i in range(orders_count)],
+        "order_status": ["delivered"] * orders_count,
+        "order_purchase_dt": [f"2017-{i % 12 + 1:02d}-01" for i in range(orders_count)],
+    })
+    return {"customers": customers, "orders": orders}
+
+
+def write_processed(orders_count=2):
+    os.makedirs("data/processed", exist_ok=True)
+    processed_store.write_processed_csvs(make_frames(orders_count))
+
+
+def write_without_manifest(name, orders_count):
+    # The first half of an upload: one data file replaced, manifest not yet written
+    local_path, _ = processed_store.PROCESSED_FILES[name]
+    make_frames(orders_count)[name].to_csv(f"{local_path}.tmp", index=False)
+    os.replace(f"{local_path}.tmp", local_path)
+
+
+def bump_mtime(path):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(data_refresh, "DATA_SOURCE", "local")
+    write_processed()
+    return tmp_path
+
+
+@pytest.fixture
+def refresher(store):
+    refresher = data_refresh.DataRefresher(interval=0.05)
+    yield refresher
+    refresher.stop()
+
+
+@pytest.fixture
+def registry(store, monkeypatch):
+    monkeypatch.setattr(data_refresh, "_active_refresher", None)
+    yield
+    if data_refresh._active_refresher is not None:
+        data_refresh._active_refresher.stop()
+
+
+def test_rerun_does_not_grow_sys_path():
+    importlib.reload(dashboard)
+    importlib.reload(dashboard)
+
+    assert sys.path.count(dashboard.ANALYSIS_PATH) == 1
+
+
+def test_load_snapshot_indexes_filter_options(store):
+    snapshot = data_refresh.load_snapshot()
+
+    assert snapshot.version == data_refresh.get_data_version()
+    assert snapshot.states == ["All States", "RJ", "SP"]
+    assert snapshot.months == ["All Months", "2017-01", "2017-02"]
+
+
+def test_refresh_returns_false_when_nothing_changed(refresher):
+    snapshot = refresher.current
+
+    assert refresher.refresh() is False
+    assert refresher.current is snapshot
+
+
+def test_refresh_swaps_on_changed_mtime(refresher):
+    snapshot = refresher.current
+    bump_mtime(ORDERS_PATH)
+    processed_store.write_local_manifest()
+
+    assert refresher.refresh() is True
+    assert refresher.current is not snapshot
+    assert refresher.current.version != snapshot.version
+
+
+def test_refresh_swaps_on_changed_size(refresher):
+    old = refresher.current
+    write_processed(orders_count=3)
+
+    assert refresher.refresh() is True
+    assert len(refresher.current.orders) == 3
+    # A run still holding the old snapshot keeps seeing the old data
+    assert len(old.orders) == 2
+    assert old.months == ["All Months", "2017-01", "2017-02"]
+
+
+def test_background_thread_swaps_snapshot(refresher):
+    old = refresher.current
+    refresher.start()
+    write_processed(orders_count=3)
+
+    assert wait_for(lambda: refresher.current is not old)
+    assert len(refresher.current.orders) == 3
+    assert len(old.orders) == 2
+
+
+def test_missing_manifest_keeps_last_good_snapshot(refresher):
+    snapshot = refresher.current
+    os.remove(processed_store.LOCAL_MANIFEST)
+
+    with pytest.raises(FileNotFoundError):
+        refresher.refresh()
+    assert refresher.current is snapshot
+
+
+def test_missing_data_file_keeps_last_good_snapshot(refresher):
+    snapshot = refresher.current
+    write_processed(orders_count=3)
+    os.remove(CUSTOMERS_PATH)
+
+    with pytest.raises(FileNotFoundError):
+        refresher.refresh()
+    assert refresher.current is snapshot
+
+
+def test_broken_file_keeps_last_good_snapshot(refresher):
+    snapshot = refresher.current
+    with open(ORDERS_PATH, "w") as f:
+        f.write("customer_id,order_status\n")
+    processed_store.write_local_manifest()
+
+    with pytest.raises(KeyError):
+        refresher.refresh()
+    assert refresher.current is snapshot
+
+
+def test_thread_survives_failed_refreshes(refresher):
+    snapshot = refresher.current
+    os.remove(processed_store.LOCAL_MANIFEST)
+    refresher.start()
+
+    assert wait_for(lambda: refresher.attempts >= 3)
+    assert refresher._thread.is_alive()
+    assert refresher.current is snapshot
+
+
+def test_half_written_store_is_not_published(refresher):
+    snapshot = refresher.current
+    write_without_manifest("customers", orders_count=3)
+
+    # The manifest still describes the previous write, so there is nothing new yet
+    assert refresher.refresh() is False
+    # A fresh load must not pair the new customers with the old orders
+    with pytest.raises(data_refresh.StaleDataError):
+        data_refresh.load_snapshot()
+
+    write_without_manifest("orders", orders_count=3)
+    processed_store.write_local_manifest()
+
+    assert refresher.refresh() is True
+    assert len(refresher.current.customers) == 3
+    assert len(refresher.current.orders) == 3
+    assert len(snapshot.customers) == 2
+
+
+def test_load_snapshot_retries_when_file_changes_mid_load(store, monkeypatch):
+    read_csv = pd.read_csv
+    calls = []
+
+    def read_during_upload(path, *args, **kwargs):
+        calls.append(path)
+        if len(calls) == 1:
+            write_processed(orders_count=3)
+        return read_csv(path, *args, **kwargs)
+
+    monkeypatch.setattr(data_refresh.pd, "read_csv", read_during_upload)
+    snapshot = data_refresh.load_snapshot()
+
+    assert len(snapshot.customers) == 3
+    assert len(snapshot.orders) == 3
+    assert snapshot.version == data_refresh.get_data_version()
+
+
+def test_start_refresher_hands_over_snapshot(registry):
+    first = data_refresh.start_refresher(interval=0.05)
+    second = data_refresh.start_refresher(interval=0.05)
+
+    assert second.current is first.current
+    assert wait_for(lambda: not first._thread.is_alive())
+    assert data_refresh._active_refresher is second
+
+
+def test_start_refresher_does_not_wait_for_old_load(registry, monkeypatch):
+    first = data_refresh.start_refresher(interval=0.01)
+    loading = threading.Event()
+    release = threading.Event()
+
+    def slow_load(*args):
+        loading.set()
+        release.wait(5)
+        return first.current
+
+    monkeypatch.setattr(data_refresh, "load_snapshot", slow_load)
+    write_processed(orders_count=3)
+    assert loading.wait(5)
+
+    started = time.monotonic()
+    data_refresh.start_refresher(interval=60)
+    assert time.monotonic() - started < 1
+    assert first._thread.is_alive()
+
+    release.set()
+    assert wait_for(lambda: not first._thread.is_alive())
+
+
+class FakeS3:
+    """
+    In-memory stand-in for the S3 calls the refresher makes
+    """
+
+    def __init__(self):
+        self.objects = {}
+
+    def etag(self, key):
+        return f'"{hash(self.objects[key])}"'
+
+    def put(self, key, body):
+        self.objects[key] = body
+
+    def put_manifest(self):
+        manifest = {
+            name: {"key": key, "etag": self.etag(key)}
+            for name, (_, key) in processed_store.PROCESSED_FILES.items()
+        }
+        self.put(processed_store.S3_MANIFEST_KEY, json.dumps(manifest))
+
+    def get_object(self, Bucket, Key, IfMatch=None):
+        from botocore.exceptions import ClientError
+        if IfMatch is not None and self.etag(Key) != IfMatch:
+            raise ClientError({"Error": {"Code": "PreconditionFailed"}}, "GetObject")
+        return {"Body": io.BytesIO(self.objects[Key].encode())}
+
+
+def upload(s3, name, orders_count):
+    _, key = processed_store.PROCESSED_FILES[name]
+    s3.put(key, make_frames(orders_count)[name].to_csv(index=False))
+
+
+def test_s3_half_upload_is_not_published(monkeypatch):
+    pytest.importorskip("botocore")
+    monkeypatch.setattr(data_refresh, "DATA_SOURCE", "s3")
+    s3 = FakeS3()
+    upload(s3, "customers", 2)
+    upload(s3, "orders", 2)
+    s3.put_manifest()
+    snapshot = data_refresh.load_snapshot(s3)
+
+    upload(s3, "customers", 3)
+    with pytest.raises(data_refresh.StaleDataError):
+        data_refresh.load_snapshot(s3)
+
+    upload(s3, "orders", 3)
+    s3.put_manifest()
+    refreshed = data_refresh.load_snapshot(s3)
+
+    assert len(snapshot.customers) == len(snapshot.orders) == 2
+    assert len(refreshed.customers) == len(refreshed.orders) == 3
+    assert refreshed.version == data_refresh.get_data_version(s3)